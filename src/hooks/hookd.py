@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Long-lived Unix-socket daemon for the workflow hooks.
+
+Each hook invocation otherwise pays the Python interpreter cold start
+(~30-80 ms) for sub-millisecond work. hookd keeps one warm process per user:
+post_todowrite / post_diagnostics / post_code_review forward their stdin over
+the socket and relay the reply, paying import cost (orjson, regex compile)
+once per session instead of once per tool event. The hook scripts keep
+working standalone when the daemon is not running.
+
+Started from the SessionStart hook; exits immediately if a daemon is already
+serving on the socket. Socket path: $CLAUDE_HOOKD_SOCKET or
+~/.claude/hookd.sock.
+
+Modes (argv):
+  (none)         -> serve forever
+  --self-check   -> round-trip requests through a temp socket (no network)
+"""
+
+import json
+import os
+import socketserver
+import sys
+
+import post_code_review
+import post_diagnostics
+import post_todowrite
+
+try:
+    import orjson as _json
+    loads = _json.loads
+except ImportError:
+    import json as _json
+    loads = _json.loads
+
+SOCKET_PATH = os.environ.get("CLAUDE_HOOKD_SOCKET",
+                             os.path.expanduser("~/.claude/hookd.sock"))
+
+_HANDLERS = {
+    "TodoWrite": post_todowrite.handle,
+    "Bash": post_diagnostics.handle,
+    "Task": post_code_review.handle,
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        raw = self.rfile.read()
+        try:
+            input_data = loads(raw)
+        except ValueError:
+            self.wfile.write(b"{}\n")
+            return
+        handler = _HANDLERS.get(input_data.get("tool_name"))
+        # handlers return ready-to-write response bytes
+        self.wfile.write(handler(input_data) if handler else b"{}\n")
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _already_running(path: str) -> bool:
+    import socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(0.2)
+            s.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def main():
+    if _already_running(SOCKET_PATH):
+        return
+    try:
+        os.unlink(SOCKET_PATH)  # stale socket from a dead daemon
+    except FileNotFoundError:
+        pass
+    with _Server(SOCKET_PATH, _Handler) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            try:
+                os.unlink(SOCKET_PATH)
+            except FileNotFoundError:
+                pass
+
+
+def self_check():
+    import socket
+    import tempfile
+    import threading
+
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "hookd.sock")
+        server = _Server(path, _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        def ask(payload: bytes) -> dict:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.settimeout(5)
+                s.connect(path)
+                s.sendall(payload)
+                s.shutdown(socket.SHUT_WR)
+                resp = b""
+                while chunk := s.recv(65536):
+                    resp += chunk
+            return json.loads(resp)
+
+        try:
+            assert ask(b'{"tool_name":"Read"}') == {}
+            assert ask(b"garbage") == {}
+            assert ask(b'{"tool_name":"Bash","tool_input":{"command":"ls"}}') == {}
+            assert ask(b'{"tool_name":"TodoWrite","transcript_path":"/nonexistent"}') == {}
+            assert _already_running(path) is True
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert _already_running(path) is False
+    print("self-check: PASS")
+
+
+if __name__ == "__main__":
+    if "--self-check" in sys.argv[1:]:
+        self_check()
+    else:
+        main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""PostToolUse hook for TodoWrite: closes the task workflow.
+
+When the todo list transitions to all-completed, block with a prompt that
+routes the agent into the finishing sequence (diagnostics -> code-reviewer ->
+final report) instead of letting it stop silently. Any other TodoWrite event
+passes through with an empty response.
+
+Transcript parsing uses orjson when available (stdlib json fallback); the
+transcript is opened in binary mode so orjson parses bytes directly.
+
+Modes (argv):
+  (none)         -> hook: read stdin JSON, emit decision JSON
+  --self-check   -> run asserts against a temp transcript (no network)
+"""
+
+import json
+import os
+import sys
+
+try:
+    import orjson as _json
+    loads = _json.loads
+except ImportError:
+    import json as _json
+    loads = _json.loads
+
+
+TAIL_WINDOW = 256 * 1024
+STATE_SUFFIX = ".hookstate"
+
+
+def parse_transcript(transcript_path: str) -> list:
+    """Todos from the last TodoWrite tool_use entry in the transcript.
+
+    A sidecar file (<transcript>.hookstate) memoizes how far the transcript
+    has been scanned and where its last TodoWrite line starts, so subsequent
+    invocations in the same session parse only the appended delta. Without a
+    valid sidecar, falls back to a tail-window scan (window doubled until a
+    TodoWrite is found or the whole file is covered).
+    """
+    try:
+        size = os.stat(transcript_path).st_size  # one syscall: existence + size
+    except OSError:
+        return []
+    state = _load_state(transcript_path, size)
+    if state is not None:
+        offset, todos = _scan_lines(transcript_path, state["scanned_to"])
+        if offset < 0:
+            offset = state["last_todowrite_offset"]
+            todos = _parse_todos_at(transcript_path, offset) if offset >= 0 else None
+    else:
+        offset, todos = _tail_scan(transcript_path, size)
+    # workflow_anchor_offset is read by post_diagnostics / post_code_review so
+    # they can scan forward from the last TodoWrite instead of a blind window
+    _save_state(transcript_path, {"scanned_to": size,
+                                  "last_todowrite_offset": offset,
+                                  "workflow_anchor_offset": offset})
+    return todos or []
+
+
+def _tail_scan(transcript_path: str, size: int):
+    window = TAIL_WINDOW
+    while True:
+        start = max(0, size - window)
+        offset, todos = _scan_lines(transcript_path, start, skip_partial=start > 0)
+        if offset >= 0 or window >= size:
+            return offset, todos
+        window *= 2
+
+
+def _scan_lines(transcript_path: str, start: int, skip_partial: bool = False):
+    """Forward scan from byte `start`; (offset, todos) of the last TodoWrite
+    line, or (-1, None) if the range has none."""
+    offset, todos = -1, None
+    with open(transcript_path, "rb") as f:
+        f.seek(start)
+        if skip_partial:
+            f.readline()  # discard the partial first line
+        pos = f.tell()
+        # one blob + one C-level split beats per-line file iteration
+        data = f.read()
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()  # split artifact of the trailing newline
+    for line in lines:
+        # cheap bytes prefilter: skip the JSON decode for non-TodoWrite lines
+        if b'"TodoWrite"' in line:
+            try:
+                entry = loads(line)
+            except ValueError:
+                entry = None
+            if (entry and entry.get("type") == "tool_use"
+                    and entry.get("name") == "TodoWrite"):
+                offset, todos = pos, entry.get("input", {}).get("todos", [])
+        pos += len(line) + 1
+    return offset, todos
+
+
+def _parse_todos_at(transcript_path: str, offset: int):
+    with open(transcript_path, "rb") as f:
+        f.seek(offset)
+        line = f.readline()
+    try:
+        entry = loads(line)
+    except ValueError:
+        return None
+    if entry.get("type") == "tool_use" and entry.get("name") == "TodoWrite":
+        return entry.get("input", {}).get("todos", [])
+    return None
+
+
+def _load_state(transcript_path: str, size: int):
+    try:
+        with open(transcript_path + STATE_SUFFIX, "rb") as f:
+            state = loads(f.read())
+    except (OSError, ValueError):
+        return None
+    try:
+        scanned_to = int(state["scanned_to"])
+        last_offset = int(state["last_todowrite_offset"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    # offsets past EOF mean the transcript was truncated/replaced: start over
+    if not 0 <= scanned_to <= size or last_offset < -1 or last_offset >= size:
+        return None
+    return {"scanned_to": scanned_to, "last_todowrite_offset": last_offset}
+
+
+def _save_state(transcript_path: str, state: dict) -> None:
+    path = transcript_path + STATE_SUFFIX
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w") as f:
+            f.write(json.dumps(state))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # cache only; next invocation re-scans
+
+
+def all_tasks_completed(todos: list) -> bool:
+    if not todos:  # all([]) is True, but an empty list is not a finished workflow
+        return False
+    _get = dict.get
+    return all(_get(todo, "status") == "completed" for todo in todos)
+
+
+_INJECTION_PROMPT = """All todos are completed. Before reporting the result, run the finishing sequence:
+
+1. Run project diagnostics for the touched languages (build / lint / type-check) and make sure the output is clean.
+2. Launch the code-reviewer subagent on the full diff of this session (Task tool, subagent_type: code-reviewer). Fix everything it flags as a defect and re-run it after non-trivial fixes.
+3. Only then write the final report: what changed and why, how it was verified (commands + observed output), and anything intentionally left out of scope.
+
+Do not mark the work as done while diagnostics are red or the review has unresolved findings."""
+
+# the non-triggering majority of invocations writes this literal: no per-call
+# encoder work on the fast path
+_EMPTY_RESPONSE = b"{}\n"
+
+# serialized once at import: the triggering path writes these bytes verbatim
+_BLOCK_RESPONSE = (json.dumps({"decision": "block", "reason": _INJECTION_PROMPT},
+                              ensure_ascii=False) + "\n").encode()
+
+
+def handle(input_data: dict) -> bytes:
+    """Response bytes for one hook payload; also the entry point used by hookd."""
+    if input_data.get("tool_name") != "TodoWrite":
+        return _EMPTY_RESPONSE
+    todos = parse_transcript(input_data.get("transcript_path", ""))
+    if all_tasks_completed(todos):
+        return _BLOCK_RESPONSE
+    return _EMPTY_RESPONSE
+
+
+HOOKD_SOCKET = os.environ.get("CLAUDE_HOOKD_SOCKET",
+                              os.path.expanduser("~/.claude/hookd.sock"))
+
+
+def _try_daemon(raw: bytes) -> bool:
+    """Forward the payload to a running hookd; False means handle locally."""
+    import socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(1.0)
+            s.connect(HOOKD_SOCKET)
+            s.sendall(raw)
+            s.shutdown(socket.SHUT_WR)
+            resp = b""
+            while chunk := s.recv(65536):
+                resp += chunk
+    except OSError:
+        return False
+    if not resp:
+        return False
+    sys.stdout.buffer.write(resp)
+    return True
+
+
+def main():
+    raw = sys.stdin.buffer.read()
+    if _try_daemon(raw):
+        sys.exit(0)
+    try:
+        # bytes straight into the parser: no Python-level text decode of a
+        # payload that can carry a large tool_response
+        input_data = loads(raw)
+    except ValueError:
+        sys.exit(0)
+    sys.stdout.buffer.write(handle(input_data))
+    sys.exit(0)
+
+
+def self_check():
+    import tempfile
+
+    assert all_tasks_completed([]) is False
+    assert all_tasks_completed([{"status": "completed"}]) is True
+    assert all_tasks_completed([{"status": "completed"}, {"status": "in_progress"}]) is False
+    assert all_tasks_completed([{}]) is False
+
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "transcript.jsonl")
+        assert parse_transcript(path) == []
+        entries = [
+            {"type": "tool_use", "name": "TodoWrite",
+             "input": {"todos": [{"status": "in_progress"}]}},
+            {"type": "text", "text": "working"},
+            {"type": "tool_use", "name": "Bash", "input": {"command": "ls"}},
+            {"type": "tool_use", "name": "TodoWrite",
+             "input": {"todos": [{"status": "completed"}]}},
+        ]
+        with open(path, "w") as f:
+            for e in entries:
+                f.write(json.dumps(e) + "\n")
+            f.write("\n")
+        assert parse_transcript(path) == [{"status": "completed"}]
+        assert os.path.exists(path + STATE_SUFFIX)
+
+        # appended delta is picked up through the sidecar
+        with open(path, "a") as f:
+            f.write(json.dumps({"type": "tool_use", "name": "TodoWrite",
+                                "input": {"todos": [{"status": "pending"}]}}) + "\n")
+        assert parse_transcript(path) == [{"status": "pending"}]
+
+        # append without TodoWrite: answer comes from the memoized offset
+        with open(path, "a") as f:
+            f.write(json.dumps({"type": "text", "text": "y"}) + "\n")
+        assert parse_transcript(path) == [{"status": "pending"}]
+
+        # corrupt sidecar falls back to the tail-window scan
+        with open(path + STATE_SUFFIX, "w") as f:
+            f.write("not json")
+        assert parse_transcript(path) == [{"status": "pending"}]
+
+        # TodoWrite older than the initial tail window is still found
+        big = os.path.join(td, "big.jsonl")
+        with open(big, "w") as f:
+            f.write(json.dumps(entries[0]) + "\n")
+            filler = json.dumps({"type": "text", "text": "x" * 80})
+            for _ in range(4000):
+                f.write(filler + "\n")
+        assert os.path.getsize(big) > TAIL_WINDOW
+        assert parse_transcript(big) == [{"status": "in_progress"}]
+    print("self-check: PASS")
+
+
+if __name__ == "__main__":
+    if "--self-check" in sys.argv[1:]:
+        self_check()
+    else:
+        main()